@@ -0,0 +1,109 @@
+"""
+Benchmark of the per-session memory of the extracted resume text and the canvas thumbnails:
+the text and the thumbnail bytes kept in the session state for the whole session vs. handles
+to the tiered blob store, where the resume text is released once the overview is created.
+Each session extracts a resume, then redraws its canvas stroke by stroke, like a candidate
+answering the architecture question, and every stroke replaces the previous thumbnail.
+
+Each storage is measured in a fresh process, after a discarded warm-up run, so neither
+inherits the allocations of the other.
+
+Usage (from the repository root):
+    python -m benchmarks.blob_memory [--sessions 50] [--resume-kb 8] [--budget-kb 256]
+"""
+import argparse
+import random
+import tracemalloc
+from multiprocessing import get_context
+from components import blob_store
+from components.canvas_payload import build_vision_payload
+from benchmarks.canvas_payload import sample_drawings
+
+
+# Function to create a synthetic resume text
+def _resume_text(seed, size):
+    """
+    Creates resume-like text of the given size in bytes (at most 10000 characters are analysed).
+    """
+    rng = random.Random(seed)
+    words = ["python", "engineer", "distributed", "systems", "led", "team", "built", "api", "cloud", "data"]
+    return " ".join(rng.choice(words) for _ in range(size // 5))[:size]
+
+
+# Function to simulate the session states of concurrent interviews
+def simulate(sessions, resume_size, use_blob_store):
+    """
+    Runs the resume extraction and the canvas drawing of the given number of interviews and
+    measures the memory they hold.
+    Returns:
+        A tuple of the traced memory in bytes once all sessions are drawn, the peak traced memory
+        and the blob store statistics at the peak of the resume extraction and at the end.
+    """
+    drawings = list(sample_drawings().values())
+    tracemalloc.start()
+    session_states = []
+
+    # Step 1: every candidate uploads a resume
+    for i in range(sessions):
+        resume_text = _resume_text(i, resume_size)
+        if use_blob_store:
+            session_states.append({"resume_handle": blob_store.put_blob(resume_text.encode(), f"bench-{i}"), "canvas_payload": None})
+        else:
+            session_states.append({"resume_text": resume_text, "canvas_payload": None})
+    resume_stats = blob_store.blob_stats()
+
+    # Step 2: the overview is created and every candidate draws the architecture answer
+    for i, session_state in enumerate(session_states):
+        if use_blob_store:
+            blob_store.release_blob(session_state.pop("resume_handle"))
+
+        drawing = drawings[i % len(drawings)]
+        for strokes in range(1, len(drawing["objects"]) + 1):
+            payload = build_vision_payload({"objects": drawing["objects"][:strokes]})
+            if use_blob_store:
+                previous_image = (session_state["canvas_payload"] or {}).get("image")
+                payload["image"] = blob_store.put_blob(payload["image"], f"bench-{i}")
+                if previous_image not in (None, payload["image"]):
+                    blob_store.release_blob(previous_image)
+            session_state["canvas_payload"] = payload
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = blob_store.blob_stats()
+
+    for i in range(sessions):
+        blob_store.release_owner_blobs(f"bench-{i}")
+    return current, peak, resume_stats, stats
+
+
+# Function to measure one storage in the current process
+def measure(sessions, resume_size, budget_bytes, use_blob_store):
+    """
+    Runs a discarded warm-up simulation, so the one-off allocations of the imaging code are not
+    measured, then the measured one.
+    """
+    blob_store.MEMORY_BUDGET_BYTES = budget_bytes
+    simulate(sessions, resume_size, use_blob_store)
+    return simulate(sessions, resume_size, use_blob_store)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="number of concurrent interviews")
+    parser.add_argument("--resume-kb", type=float, default=8, help="size of each extracted resume text in KB")
+    parser.add_argument("--budget-kb", type=float, default=256, help="in-memory budget of the blob store in KB")
+    args = parser.parse_args()
+
+    resume_size, budget_bytes = int(args.resume_kb * 1024), int(args.budget_kb * 1024)
+    print(f"{'storage':<14}{'peak KB':>9}{'end KB':>8}{'end/session KB':>16}{'resume hot/spilled KB':>23}{'end hot/spilled KB':>20}")
+    for name, use_blob_store in (("session state", False), ("blob store", True)):
+        # A fresh process per storage, so the measure does not depend on the run order
+        with get_context("spawn").Pool(1) as pool:
+            current, peak, resume_stats, stats = pool.apply(measure, (args.sessions, resume_size, budget_bytes, use_blob_store))
+        resume_tiers = f"{resume_stats['memory_bytes'] / 1024:.1f}/{resume_stats['spilled_bytes'] / 1024:.1f}"
+        end_tiers = f"{stats['memory_bytes'] / 1024:.1f}/{stats['spilled_bytes'] / 1024:.1f}"
+        print(f"{name:<14}{peak / 1024:>9.1f}{current / 1024:>8.1f}{current / 1024 / args.sessions:>16.2f}{resume_tiers:>23}{end_tiers:>20}")
+
+
+if __name__ == "__main__":
+    main()
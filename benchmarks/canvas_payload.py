@@ -0,0 +1,147 @@
+"""
+Benchmark of the canvas vision payload: full-resolution raster vs. simplified vector pipeline.
+
+Usage (from the repository root):
+    python -m benchmarks.canvas_payload                 # payload sizes only
+    python -m benchmarks.canvas_payload --agreement     # also compare the vision analyses (needs OPENAI_API_KEY)
+"""
+import argparse
+import base64
+import math
+import os
+import random
+import re
+from io import BytesIO
+from PIL import Image, ImageDraw
+from components.canvas_payload import build_vision_payload, extract_shapes
+
+CANVAS_WIDTH, CANVAS_HEIGHT = 600, 300  # st_canvas default width, height used by draw_canvas
+
+
+# Function to create a freehand stroke in the fabric.js path format
+def _freehand(points):
+    xs, ys = [x for x, _ in points], [y for _, y in points]
+    return {
+        "type": "path", "left": min(xs), "top": min(ys), "width": max(xs) - min(xs), "height": max(ys) - min(ys), "strokeWidth": 3,
+        "path": [["M", *points[0]]] + [["Q", x, y, x, y] for x, y in points[1:]],
+    }
+
+
+# Function to create a hand-drawn-like line between two points
+def _wobbly_line(rng, start, end, steps=60):
+    return [
+        (start[0] + (end[0] - start[0]) * t / steps + rng.uniform(-1.5, 1.5),
+         start[1] + (end[1] - start[1]) * t / steps + rng.uniform(-1.5, 1.5))
+        for t in range(steps + 1)
+    ]
+
+
+# Function to build the sample drawings
+def sample_drawings():
+    """
+    Returns synthetic canvas drawings resembling architecture answers, in the st_canvas JSON format.
+    """
+    rng = random.Random(0)
+
+    # Linked list drawn with the rect and line tools
+    linked_list = {"objects": []}
+    for i in range(4):
+        linked_list["objects"].append({"type": "rect", "left": 30 + i * 140, "top": 120, "width": 80, "height": 50, "strokeWidth": 3})
+        if i < 3:
+            linked_list["objects"].append({"type": "line", "left": 150 + i * 140, "top": 145, "width": 60, "height": 0,
+                                           "originX": "center", "originY": "center", "x1": -30, "y1": 0, "x2": 30, "y2": 0, "strokeWidth": 3})
+
+    # Binary tree drawn freehand
+    tree = {"objects": []}
+    nodes = [(300, 40), (180, 140), (420, 140), (120, 250), (240, 250), (360, 250), (480, 250)]
+    for x, y in nodes:
+        tree["objects"].append(_freehand([(x + 25 * math.cos(a / 10), y + 25 * math.sin(a / 10)) for a in range(64)]))
+    for parent, child in [(0, 1), (0, 2), (1, 3), (1, 4), (2, 5), (2, 6)]:
+        tree["objects"].append(_freehand(_wobbly_line(rng, nodes[parent], nodes[child])))
+
+    # Client/server diagram mixing circles, rects and freehand arrows
+    client_server = {"objects": [
+        {"type": "circle", "left": 40, "top": 150, "width": 80, "height": 80, "radius": 40, "originX": "left", "originY": "center", "strokeWidth": 3},
+        {"type": "rect", "left": 250, "top": 100, "width": 100, "height": 100, "strokeWidth": 3},
+        {"type": "rect", "left": 460, "top": 110, "width": 100, "height": 80, "strokeWidth": 3},
+        _freehand(_wobbly_line(rng, (120, 150), (250, 150))),
+        _freehand(_wobbly_line(rng, (350, 150), (460, 150))),
+    ]}
+
+    return {"linked_list": linked_list, "binary_tree": tree, "client_server": client_server}
+
+
+# Function to render the full-resolution raster sent before the pipeline
+def full_raster(json_data):
+    """
+    Renders the drawing like st_canvas' image_data: a full-size RGBA PNG of the unsimplified strokes.
+    """
+    img = Image.new("RGBA", (CANVAS_WIDTH, CANVAS_HEIGHT), (238, 238, 238, 255))
+    draw = ImageDraw.Draw(img)
+    for shape in extract_shapes(json_data):
+        points = shape["points"] + shape["points"][:1] if shape["closed"] else shape["points"]
+        draw.line(points, fill=(0, 0, 0, 255), width=shape["stroke_width"], joint="curve")
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode()
+
+
+# Function to estimate the vision tokens of an image
+def image_tokens(width, height, detail):
+    """
+    Estimates the input tokens of an image for gpt-4o-mini class models (85 base tokens,
+    plus 170 per 512px tile in high detail).
+    """
+    if detail == "low":
+        return 85
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+# Function to measure how much two analyses agree
+def agreement(text_a, text_b):
+    """
+    Computes the Jaccard similarity of the word sets of two analyses.
+    """
+    words_a, words_b = set(re.findall(r"\w+", text_a.lower())), set(re.findall(r"\w+", text_b.lower()))
+    return len(words_a & words_b) / len(words_a | words_b) if words_a | words_b else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agreement", action="store_true", help="compare the vision analyses of both payloads")
+    parser.add_argument("--sizes", default="512,384,256,128", help="comma separated thumbnail sizes to compare")
+    args = parser.parse_args()
+
+    if args.agreement:
+        from components.call_gpt import bind_api_key, call_gpt_vision
+
+    question = "Draw and explain the architecture."
+    print(f"{'drawing':<14}{'payload':<12}{'bytes':>8}{'tokens':>8}{'agreement':>11}")
+    for name, json_data in sample_drawings().items():
+        raster = full_raster(json_data)
+        raster_tokens = image_tokens(CANVAS_WIDTH, CANVAS_HEIGHT, "auto")
+        print(f"{name:<14}{'raster':<12}{len(raster):>8}{raster_tokens:>8}{'-':>11}")
+
+        baseline = None
+        if args.agreement:
+            with bind_api_key(os.getenv("OPENAI_API_KEY")):
+                baseline = call_gpt_vision(raster, question, detail="auto")
+
+        for size in (int(size) for size in args.sizes.split(",")):
+            payload = build_vision_payload(json_data, max_size=size)
+            image_base64 = base64.b64encode(payload["image"]).decode()
+            size_bytes = len(image_base64) + len(payload["description"])
+            tokens = image_tokens(size, size, "low") + len(payload["description"]) // 4
+            score = "-"
+            if args.agreement:
+                with bind_api_key(os.getenv("OPENAI_API_KEY")):
+                    score = f"{agreement(baseline, call_gpt_vision(image_base64, question, payload['description'])):.2f}"
+            print(f"{'':<14}{f'vector@{size}':<12}{size_bytes:>8}{tokens:>8}{score:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from io import BytesIO
+
+# Bytes of blobs kept in memory (across all sessions) before the least recently used ones spill to disk
+MEMORY_BUDGET_BYTES = int(os.getenv("TALENTSCOUT_BLOB_MEMORY_BUDGET", str(8 * 1024 * 1024)))
+# Directory of the spilled blobs
+SPILL_DIR = os.getenv("TALENTSCOUT_BLOB_DIR") or tempfile.mkdtemp(prefix="talentscout-blobs-")
+# Spilled blobs at least this large are read back through a memory map instead of being loaded
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+# Spilled blobs are stored compressed only if compression saves at least this fraction
+MIN_COMPRESSION_SAVING = 0.1
+# Blobs not accessed for this long are released, e.g. when the candidate left without finishing
+BLOB_TTL_SECONDS = int(os.getenv("TALENTSCOUT_BLOB_TTL", "7200"))
+
+_hot = OrderedDict()
+_blobs = {}
+_hot_bytes = 0
+_lock = threading.Lock()
+
+
+# Function to move the least recently used blobs to disk
+def _spill():
+    """
+    Writes the least recently used in-memory blobs to the spill directory until the in-memory
+    size fits the budget. Must be called with the lock held.
+    """
+    global _hot_bytes
+    while _hot_bytes > MEMORY_BUDGET_BYTES and _hot:
+        handle, data = _hot.popitem(last=False)
+        _hot_bytes -= len(data)
+
+        compressed = zlib.compress(data, 6)
+        is_compressed = len(compressed) <= len(data) * (1 - MIN_COMPRESSION_SAVING)
+        path = os.path.join(SPILL_DIR, handle.replace(":", "_"))
+        with open(path, "wb") as f:
+            f.write(compressed if is_compressed else data)
+        _blobs[handle].update(path=path, compressed=is_compressed)
+
+
+# Function to release the blobs that have not been accessed for a long time
+def _sweep_expired(now):
+    """
+    Releases the blobs not accessed for BLOB_TTL_SECONDS. Must be called with the lock held.
+    """
+    for handle, blob in list(_blobs.items()):
+        if now - blob["accessed_at"] > BLOB_TTL_SECONDS:
+            _release(handle)
+
+
+# Function to release a blob
+def _release(handle):
+    """
+    Drops a blob from memory and deletes its spilled file. Must be called with the lock held.
+    """
+    global _hot_bytes
+    blob = _blobs.pop(handle, None)
+    if blob is None:
+        return
+    if handle in _hot:
+        _hot_bytes -= len(_hot.pop(handle))
+    if blob["path"] is not None and os.path.exists(blob["path"]):
+        os.remove(blob["path"])
+
+
+# Function to store a blob
+def put_blob(data: bytes, owner: str) -> str:
+    """
+    Stores the bytes and returns a handle to them. Storing the same bytes again for the
+    same owner returns the same handle without copying them.
+    Args:
+        data: The bytes to store.
+        owner: The id of the session owning the blob.
+    Returns:
+        The handle of the blob, to be kept in the session state instead of the bytes.
+    """
+    global _hot_bytes
+    handle = f"{owner}:{hashlib.sha256(data).hexdigest()[:32]}"
+    now = time.monotonic()
+
+    with _lock:
+        _sweep_expired(now)
+        if handle in _blobs:
+            _blobs[handle]["accessed_at"] = now
+            return handle
+
+        _blobs[handle] = {"owner": owner, "size": len(data), "path": None, "compressed": False, "accessed_at": now}
+        _hot[handle] = bytes(data)
+        _hot_bytes += len(data)
+        _spill()
+
+    return handle
+
+
+# Function to open a blob as a read-only file-like object
+def open_blob(handle: str):
+    """
+    Opens a blob for reading. Large blobs spilled uncompressed are memory-mapped, so they are
+    paged in from disk on demand instead of being loaded.
+    Args:
+        handle: The handle returned by put_blob.
+    Returns:
+        A file-like object supporting read, seek, tell and the context manager protocol.
+    """
+    with _lock:
+        blob = _blobs[handle]
+        blob["accessed_at"] = time.monotonic()
+        if handle in _hot:
+            _hot.move_to_end(handle)
+            return BytesIO(_hot[handle])
+        path, compressed, size = blob["path"], blob["compressed"], blob["size"]
+
+    with open(path, "rb") as f:
+        if compressed:
+            return BytesIO(zlib.decompress(f.read()))
+        if size >= MMAP_THRESHOLD_BYTES:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return BytesIO(f.read())
+
+
+# Function to read the content of a blob
+def get_blob(handle: str) -> bytes:
+    """
+    Reads the whole content of a blob.
+    Args:
+        handle: The handle returned by put_blob.
+    Returns:
+        The bytes of the blob.
+    """
+    with open_blob(handle) as f:
+        return f.read()
+
+
+# Function to release a blob
+def release_blob(handle: str):
+    """
+    Releases a blob that is no longer needed.
+    """
+    with _lock:
+        _release(handle)
+
+
+# Function to release all blobs of a session
+def release_owner_blobs(owner: str):
+    """
+    Releases every blob owned by the session, e.g. when the interview is finished.
+    """
+    with _lock:
+        for handle, blob in list(_blobs.items()):
+            if blob["owner"] == owner:
+                _release(handle)
+
+
+# Function to report the blob store usage
+def blob_stats():
+    """
+    Summarizes the blob store usage.
+    Returns:
+        A dictionary with the number of blobs, the bytes held in memory and the number and
+        total size of the spilled blobs.
+    """
+    with _lock:
+        spilled = [blob for handle, blob in _blobs.items() if handle not in _hot]
+        return {
+            "blobs": len(_blobs),
+            "memory_bytes": _hot_bytes,
+            "spilled_blobs": len(spilled),
+            "spilled_bytes": sum(os.path.getsize(blob["path"]) for blob in spilled if os.path.exists(blob["path"])),
+        }
@@ -1,16 +1,38 @@
+import threading
+from contextlib import contextmanager
 from openai import OpenAI
 import streamlit as st
+from components.model_router import select_tier, timed_call
 
-def call_gpt(system_message, user_message, outputStructure):
+# API key bound to the current background job thread, which has no access to the session state
+_job_context = threading.local()
+
+@contextmanager
+def bind_api_key(api_key):
+    # Bind the session's API key to the current thread while a background job runs
+    _job_context.api_key = api_key
+    try:
+        yield
+    finally:
+        _job_context.api_key = None
+
+def get_api_key():
+    # Prefer the key bound to a background job, otherwise use the session's key
+    return getattr(_job_context, "api_key", None) or st.session_state.api_key
+
+def call_gpt(system_message, user_message, outputStructure, route=None):
     # print("API Key: ", (st.session_state.api_key).strip())
-    client = OpenAI(api_key=st.session_state.api_key)
+    # Pick the model tier for this call site
+    tier_name, tier = select_tier(route)
+    client = OpenAI(api_key=get_api_key(), base_url=tier["base_url"])
 
     # Send the request to OpenAI API using chat completion
-    completion = client.beta.chat.completions.parse(
-        model = "gpt-4o-mini",
-        messages = [system_message, user_message],
-        response_format = outputStructure
-    )
+    with timed_call(route, tier_name):
+        completion = client.beta.chat.completions.parse(
+            model = tier["model"],
+            messages = [system_message, user_message],
+            response_format = outputStructure
+        )
 
     # Parse the response and extract details as a dictionary
     return completion.choices[0].message.parsed
@@ -45,26 +67,32 @@ def check_gpt(OPENAI_API_KEY):
         st.error(f"Error calling GPT: {e}")
         return False
     
-def call_gpt_vision(base64_image, question):
-    client = OpenAI(api_key=st.session_state.api_key)
+def call_gpt_vision(base64_image, question, description=None, detail="low"):
+    tier_name, tier = select_tier("call_gpt_vision")
+    client = OpenAI(api_key=get_api_key(), base_url=tier["base_url"])
+
+    content = [
+        {
+            "type": "text",
+            "text": "As an Interviewer, analyse the architecture drawn in the image and explain the image. Do not add your own explaination. Stick to what the user has drawn. If the user has drawn nothing or bad in knowledge, mention it. Questions: "+ question,
+        },
+    ]
+
+    # Compact description of the vector shapes sent alongside the thumbnail
+    if description:
+        content.append({"type": "text", "text": "Shapes drawn on the canvas (pixel coordinates in the image): " + description})
+
+    # The canvas thumbnail is small enough to be analysed in low detail
+    if base64_image:
+        content.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:image/png;base64,{base64_image}", "detail": detail},
+        })
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": "As an Interviewer, analyse the architecture drawn in the image and explain the image. Do not add your own explaination. Stick to what the user has drawn. If the user has drawn nothing or bad in knowledge, mention it. Questions: "+ question,
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"},
-                    },
-                ],
-            }
-        ],
-    )
+    with timed_call("call_gpt_vision", tier_name):
+        response = client.chat.completions.create(
+            model=tier["model"],
+            messages=[{"role": "user", "content": content}],
+        )
 
-    return response.choices[0].message.content
\ No newline at end of file
+    return response.choices[0].message.content
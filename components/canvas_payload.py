@@ -0,0 +1,239 @@
+import math
+from io import BytesIO
+from PIL import Image, ImageDraw
+
+# Maximum distance (in canvas pixels) a simplified stroke may deviate from the drawn one
+SIMPLIFY_EPSILON = 2.0
+# Longest side of the thumbnail sent to the vision model. Up to 512px the model
+# can analyse it in "low" detail, which costs a fixed small number of tokens
+MAX_THUMBNAIL_SIZE = 384
+# Margin (in canvas pixels) kept around the drawing when cropping
+CROP_MARGIN = 10
+# Maximum number of shapes listed in the textual description
+MAX_DESCRIBED_SHAPES = 40
+# Number of segments used to approximate a circle
+CIRCLE_SEGMENTS = 24
+
+
+# Function to map a point from object coordinates to canvas coordinates
+def _transform(obj, center, x, y):
+    """
+    Applies the scale and rotation of a fabric.js object to a point relative to its center.
+    """
+    angle = math.radians(obj.get("angle", 0))
+    x, y = x * obj.get("scaleX", 1), y * obj.get("scaleY", 1)
+    return (
+        center[0] + x * math.cos(angle) - y * math.sin(angle),
+        center[1] + x * math.sin(angle) + y * math.cos(angle),
+    )
+
+
+# Function to get the center of a fabric.js object on the canvas
+def _center(obj):
+    """
+    Computes the canvas position of the object's center from its origin, size, scale and angle.
+    """
+    offsets = {"left": 0.5, "top": 0.5, "center": 0, "right": -0.5, "bottom": -0.5}
+    dx = offsets.get(obj.get("originX", "left"), 0) * obj.get("width", 0)
+    dy = offsets.get(obj.get("originY", "top"), 0) * obj.get("height", 0)
+    return _transform(obj, (obj.get("left", 0), obj.get("top", 0)), dx, dy)
+
+
+# Function to convert the canvas objects to polylines
+def extract_shapes(json_data):
+    """
+    Converts the fabric.js objects of the canvas (canvas_result.json_data) to polylines in canvas coordinates.
+    Args:
+        json_data: The JSON data returned by st_canvas.
+    Returns:
+        A list of shapes, each a dictionary with its kind, points, whether it is closed, its stroke width
+        and, for rectangles and circles, its size.
+    """
+    shapes = []
+    for obj in (json_data or {}).get("objects", []):
+        kind = obj.get("type")
+        center = _center(obj)
+        stroke_width = obj.get("strokeWidth", 1)
+
+        if kind == "path":
+            # Freehand strokes are stored in absolute coordinates around the path's own center
+            path_points = [(command[-2], command[-1]) for command in obj.get("path", []) if len(command) >= 3]
+            if not path_points:
+                continue
+            xs, ys = [x for x, _ in path_points], [y for _, y in path_points]
+            offset = ((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2)
+            points = [_transform(obj, center, x - offset[0], y - offset[1]) for x, y in path_points]
+            shapes.append({"kind": "stroke", "points": points, "closed": False, "stroke_width": stroke_width})
+
+        elif kind == "line":
+            points = [_transform(obj, center, obj.get("x1", 0), obj.get("y1", 0)),
+                      _transform(obj, center, obj.get("x2", 0), obj.get("y2", 0))]
+            shapes.append({"kind": "line", "points": points, "closed": False, "stroke_width": stroke_width})
+
+        elif kind == "rect":
+            half_width, half_height = obj.get("width", 0) / 2, obj.get("height", 0) / 2
+            corners = [(-half_width, -half_height), (half_width, -half_height), (half_width, half_height), (-half_width, half_height)]
+            points = [_transform(obj, center, x, y) for x, y in corners]
+            size = (obj.get("width", 0) * obj.get("scaleX", 1), obj.get("height", 0) * obj.get("scaleY", 1))
+            shapes.append({"kind": "rect", "points": points, "closed": True, "stroke_width": stroke_width, "size": size})
+
+        elif kind == "circle":
+            radius = obj.get("radius", 0)
+            points = [
+                _transform(obj, center, radius * math.cos(2 * math.pi * i / CIRCLE_SEGMENTS), radius * math.sin(2 * math.pi * i / CIRCLE_SEGMENTS))
+                for i in range(CIRCLE_SEGMENTS)
+            ]
+            shapes.append({"kind": "circle", "points": points, "closed": True, "stroke_width": stroke_width, "size": (radius * obj.get("scaleX", 1),)})
+
+    return shapes
+
+
+# Function to simplify a polyline
+def simplify_polyline(points, epsilon=SIMPLIFY_EPSILON):
+    """
+    Decimates a polyline with the Ramer-Douglas-Peucker algorithm.
+    Args:
+        points: The list of (x, y) points.
+        epsilon: The maximum distance a removed point may be from the simplified polyline.
+    Returns:
+        The simplified list of points, keeping the first and last points.
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        (x1, y1), (x2, y2) = points[start], points[end]
+        length = math.hypot(x2 - x1, y2 - y1)
+
+        farthest, max_distance = None, epsilon
+        for i in range(start + 1, end):
+            x0, y0 = points[i]
+            if length == 0:
+                distance = math.hypot(x0 - x1, y0 - y1)
+            else:
+                distance = abs((x2 - x1) * (y1 - y0) - (x1 - x0) * (y2 - y1)) / length
+            if distance > max_distance:
+                farthest, max_distance = i, distance
+
+        if farthest is not None:
+            keep[farthest] = True
+            stack.extend([(start, farthest), (farthest, end)])
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+# Function to compute how the drawing maps onto the thumbnail
+def _thumbnail_frame(shapes, max_size):
+    """
+    Computes the crop and scale of the thumbnail: the drawing is cropped to its bounding box
+    plus CROP_MARGIN, then scaled down so the longest side is at most max_size.
+    Returns:
+        A tuple of the crop offset (left, top), the thumbnail size (width, height) and the scale,
+        or None if there are no points.
+    """
+    points = [point for shape in shapes for point in shape["points"]]
+    if not points:
+        return None
+
+    left = min(x for x, _ in points) - CROP_MARGIN
+    top = min(y for _, y in points) - CROP_MARGIN
+    width = max(x for x, _ in points) + CROP_MARGIN - left
+    height = max(y for _, y in points) + CROP_MARGIN - top
+    scale = min(1.0, max_size / max(width, height))
+    return (left, top), (max(1, round(width * scale)), max(1, round(height * scale))), scale
+
+
+# Function to rasterize the shapes into a small thumbnail
+def rasterize(shapes, max_size=MAX_THUMBNAIL_SIZE):
+    """
+    Draws the shapes in black on white, cropped to the drawing and scaled down so the longest side
+    is at most max_size. Drawings smaller than max_size are not upscaled.
+    Args:
+        shapes: The shapes returned by extract_shapes.
+        max_size: The longest side of the thumbnail in pixels.
+    Returns:
+        The PNG bytes of the grayscale thumbnail, or None if there is nothing to draw.
+    """
+    frame = _thumbnail_frame(shapes, max_size)
+    if frame is None:
+        return None
+    (left, top), size, scale = frame
+
+    img = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(img)
+    for shape in shapes:
+        scaled = [((x - left) * scale, (y - top) * scale) for x, y in shape["points"]]
+        if shape["closed"]:
+            scaled.append(scaled[0])
+        line_width = max(1, round(shape["stroke_width"] * scale))
+        if len(scaled) == 1:
+            draw.point(scaled, fill=0)
+        else:
+            draw.line(scaled, fill=0, width=line_width, joint="curve")
+
+    buffered = BytesIO()
+    img.save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
+
+
+# Function to describe the shapes in a compact text
+def describe_shapes(shapes, max_size=MAX_THUMBNAIL_SIZE):
+    """
+    Creates a compact textual description of the shapes drawn on the canvas, in the pixel
+    coordinates of the thumbnail built with the same max_size, so it matches the image.
+    Args:
+        shapes: The shapes returned by extract_shapes.
+        max_size: The longest side of the thumbnail in pixels.
+    Returns:
+        A string listing the shapes with their positions and sizes in thumbnail pixels.
+    """
+    frame = _thumbnail_frame(shapes, max_size)
+    if frame is None:
+        return "The canvas is empty."
+    (left, top), _, scale = frame
+
+    # Function to map a canvas point to a rounded thumbnail pixel
+    def to_thumbnail(x, y):
+        return round((x - left) * scale), round((y - top) * scale)
+
+    lines = []
+    for shape in shapes[:MAX_DESCRIBED_SHAPES]:
+        xs, ys = [x for x, _ in shape["points"]], [y for _, y in shape["points"]]
+        center = to_thumbnail((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2)
+        if shape["kind"] == "rect":
+            lines.append(f"rect {round(shape['size'][0] * scale)}x{round(shape['size'][1] * scale)} at {center}")
+        elif shape["kind"] == "circle":
+            lines.append(f"circle r={round(shape['size'][0] * scale)} at {center}")
+        else:
+            start = to_thumbnail(*shape["points"][0])
+            end = to_thumbnail(*shape["points"][-1])
+            lines.append(f"{shape['kind']} {len(shape['points'])}pts {start}->{end}")
+
+    if len(shapes) > MAX_DESCRIBED_SHAPES:
+        lines.append(f"... and {len(shapes) - MAX_DESCRIBED_SHAPES} more shapes")
+    return "; ".join(lines)
+
+
+# Function to build the payload sent to the vision model for a drawing
+def build_vision_payload(json_data, epsilon=SIMPLIFY_EPSILON, max_size=MAX_THUMBNAIL_SIZE):
+    """
+    Builds a compact payload for the vision model from the vector strokes of the canvas,
+    instead of the full-resolution raster.
+    Args:
+        json_data: The JSON data returned by st_canvas.
+        epsilon: The tolerance of the stroke simplification in canvas pixels.
+        max_size: The longest side of the thumbnail in pixels.
+    Returns:
+        A dictionary with the PNG bytes of the thumbnail (None if nothing is drawn)
+        and the textual description of the shapes in thumbnail pixels.
+    """
+    shapes = extract_shapes(json_data)
+    for shape in shapes:
+        if shape["kind"] == "stroke":
+            shape["points"] = simplify_polyline(shape["points"], epsilon)
+
+    return {"image": rasterize(shapes, max_size), "description": describe_shapes(shapes, max_size)}
@@ -0,0 +1,51 @@
+from typing import List
+from pydantic import BaseModel
+from components.call_gpt import call_gpt
+
+
+# Function to analyze a single conversation and provide a brief summary
+def conversation_analysis(conversation: str) -> str:
+    """
+    Analyzes the user's conversation to provide a very small brief summary based on communication
+    and technical skills. The summary is objective and concise.
+
+    Args:
+        conversation (str): The conversation to analyze.
+
+    Returns:
+        str: A brief summary based on communication and technical skills.
+    """
+    class Summary(BaseModel):
+        summary: str
+
+    # System message instructing the AI to analyze the conversation
+    system_message = {
+        "role": "system",
+        "content": "Analyze the user's conversation and provide a very small brief summary on the basis of communication and technical skills objectively."
+    }
+
+    # User message containing the conversation to analyze
+    user_message = {
+        "role": "user",
+        "content": "Analyze the following conversation. Provide a very small summary on the basis of communication and technical skills based on the content.\n\n" + conversation
+    }
+
+    # Call the GPT model to generate the summary
+    return call_gpt(system_message, user_message, outputStructure=Summary, route="conversation_analysis").summary
+
+
+# Function to combine all messages of a conversation into a single text string
+def format_conversation(conversation: List[tuple]) -> str:
+    """
+    Formats a conversation as one "role: message" line per message.
+
+    Args:
+        conversation (List[tuple]): The (role, message) pairs of the conversation.
+
+    Returns:
+        str: The conversation text.
+    """
+    conversation_text = ""
+    for role, msg in conversation:
+        conversation_text += f"{role}: {msg}\n"
+    return conversation_text
@@ -0,0 +1,309 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from components.call_gpt import bind_api_key
+from components.model_router import percentile
+from components.turn_journal import get_session_id
+
+# Shared in-process executor running the LLM calls a candidate is waiting for off the Streamlit script thread
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TALENTSCOUT_JOB_WORKERS", "4")),
+    thread_name_prefix="talentscout-job",
+)
+# Separate executor for the background jobs nobody is waiting for yet (e.g. the precomputed
+# conversation summaries), so they never delay the interactive jobs of other candidates
+_background_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TALENTSCOUT_BACKGROUND_JOB_WORKERS", "2")),
+    thread_name_prefix="talentscout-background-job",
+)
+
+# Seconds between two polls of the pending jobs
+POLL_INTERVAL = 0.5
+# Jobs of a session whose browser disconnected (the candidate left) for this long are cancelled and forgotten
+JOB_ABANDON_SECONDS = 120
+# Times a failed job can be retried by the user
+MAX_JOB_RETRIES = 3
+
+_jobs = {}
+_sessions = {}
+_run_times = deque(maxlen=500)
+_counters = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0}
+_lock = threading.Lock()
+
+
+# Function to run a job on a worker thread and record its timings
+def _run_job(job, api_key, func, args, kwargs):
+    """
+    Runs the job function with the session's API key bound to the worker thread.
+    """
+    with _lock:
+        if job["status"] == "cancelled":
+            return None
+        job["status"] = "running"
+        job["started_at"] = time.monotonic()
+
+    try:
+        with bind_api_key(api_key):
+            result = func(*args, **kwargs)
+    except Exception:
+        _finish_job(job, "failed")
+        raise
+
+    _finish_job(job, "done")
+    return result
+
+
+# Function to mark a job as finished
+def _finish_job(job, status):
+    """
+    Records the end of a job unless it was cancelled while running.
+    """
+    with _lock:
+        job["finished_at"] = time.monotonic()
+        if job["status"] == "cancelled":
+            return
+        job["status"] = status
+        _counters[status] += 1
+        _run_times.append(job["finished_at"] - job["started_at"])
+
+
+# Function to check whether the browser of a session is still connected
+def _is_connected(session):
+    """
+    Asks the Streamlit runtime whether the session's websocket is still open. Must be called with the lock held.
+    """
+    return session["runtime_id"] is not None and Runtime.exists() and Runtime.instance().is_active_session(session["runtime_id"])
+
+
+# Function to cancel the jobs of sessions whose candidate left
+def _sweep_abandoned(now):
+    """
+    Cancels and forgets the jobs of sessions that are disconnected and have not run the page for
+    JOB_ABANDON_SECONDS. Sessions still connected are never swept, however long the candidate
+    stays idle. Must be called with the lock held.
+    """
+    for session_id, session in list(_sessions.items()):
+        if not _is_connected(session) and now - session["last_seen"] > JOB_ABANDON_SECONDS:
+            _cancel_session(session_id)
+            for job_id, job in list(_jobs.items()):
+                if job["session_id"] == session_id:
+                    del _jobs[job_id]
+            del _sessions[session_id]
+
+
+# Function to cancel the pending jobs of a session
+def _cancel_session(session_id):
+    """
+    Cancels every pending job of the session. Must be called with the lock held.
+    """
+    for job in _jobs.values():
+        if job["session_id"] == session_id:
+            _cancel(job)
+
+
+# Function to cancel a single job
+def _cancel(job):
+    """
+    Cancels a queued job, or marks a running one as cancelled so its result is discarded.
+    Must be called with the lock held.
+    """
+    if job["status"] in ("queued", "running"):
+        job["future"].cancel()
+        job["status"] = "cancelled"
+        _counters["cancelled"] += 1
+
+
+# Function to record that the current session is running the page
+def track_session():
+    """
+    Refreshes the heartbeat of the current session and sweeps the sessions whose candidate left.
+    Called on every page run.
+    """
+    ctx = get_script_run_ctx()
+    now = time.monotonic()
+    with _lock:
+        _sessions[get_session_id()] = {"last_seen": now, "runtime_id": ctx.session_id if ctx is not None else None}
+        _sweep_abandoned(now)
+
+
+# Function to look up a job of the current session by name
+def _get_job(name):
+    """
+    Returns the job submitted under the given name by the current session, or None.
+    """
+    job_id = st.session_state.setdefault("jobs", {}).get(name)
+    with _lock:
+        return _jobs.get(job_id)
+
+
+# Function to submit a background job
+def submit_job(name, func, *args, background=False, **kwargs):
+    """
+    Submits the function to an executor under the given name. Submitting a name again returns
+    the existing job, so jobs survive reruns and are never submitted twice. A background job
+    that has not started yet is moved to the interactive executor when submitted again without
+    background.
+    Cancelled jobs are resubmitted. Failed jobs are kept, so their error surfaces through
+    job_result, until the user retries them (see show_job_error).
+    Args:
+        name: The name of the job, unique within the session.
+        func: The function to run. It must not access the session state.
+        background: Whether nobody is waiting for the job yet. Background jobs run on their
+            own executor, so they never delay the jobs candidates are waiting for.
+    Returns:
+        The id of the job.
+    """
+    job = _get_job(name)
+    if job is not None and job["status"] != "cancelled":
+        # A candidate now waits for a background job that has not started: move it to the interactive executor
+        if not (job["background"] and not background and job["future"].cancel()):
+            return job["id"]
+        with _lock:
+            _jobs.pop(job["id"], None)
+            _counters["submitted"] -= 1
+
+    job = {
+        "id": uuid.uuid4().hex,
+        "session_id": get_session_id(),
+        "status": "queued",
+        "background": background,
+        "submitted_at": time.monotonic(),
+        "started_at": None,
+        "finished_at": None,
+    }
+    with _lock:
+        _jobs[job["id"]] = job
+        _counters["submitted"] += 1
+        executor = _background_executor if background else _executor
+        job["future"] = executor.submit(_run_job, job, st.session_state.api_key, func, args, kwargs)
+
+    st.session_state.jobs[name] = job["id"]
+    return job["id"]
+
+
+# Function to get the status of a job
+def job_status(name):
+    """
+    Returns the status of the job ("queued", "running", "done", "failed" or "cancelled"),
+    or None if no job was submitted under that name.
+    """
+    job = _get_job(name)
+    return job["status"] if job is not None else None
+
+
+# Function to get the timings of a job
+def job_timings(name):
+    """
+    Returns the submission, start and finish times of the job (time.monotonic() values),
+    or None if no job was submitted under that name.
+    """
+    job = _get_job(name)
+    if job is None:
+        return None
+    return {key: job[key] for key in ("submitted_at", "started_at", "finished_at")}
+
+
+# Function to get the result of a job
+def job_result(name):
+    """
+    Returns the result of the job if it is done, or None if it is still pending.
+    If the job failed, its exception is raised on every call until the job is retried.
+    """
+    job = _get_job(name)
+    if job is None or job["status"] in ("queued", "running", "cancelled"):
+        return None
+    return job["future"].result()
+
+
+# Function to show the error of a failed job and let the user retry it
+def show_job_error(name, error):
+    """
+    Shows the error of a failed job with a "Retry" button, up to MAX_JOB_RETRIES times.
+    Clicking it forgets the failed job, so the page submits it again on the rerun. Jobs are
+    never retried automatically, so a permanent error (e.g. an invalid API key or an exhausted
+    quota) does not keep calling the API.
+    Args:
+        name: The name of the failed job.
+        error: The exception raised by job_result.
+    """
+    retries = st.session_state.setdefault("job_retries", {}).get(name, 0)
+    if retries >= MAX_JOB_RETRIES:
+        st.error(f"Something went wrong: {error}. Please try again later.")
+        return
+
+    st.error(f"Something went wrong: {error}")
+    if st.button("Retry", key=f"retry:{name}"):
+        st.session_state.job_retries[name] = retries + 1
+        st.session_state.jobs.pop(name, None)
+        st.rerun()
+
+
+# Fragment polling the pending jobs without rerunning the whole page
+@st.fragment(run_every=POLL_INTERVAL)
+def _poll_jobs(names, message):
+    """
+    Shows the progress message while any of the jobs is pending, then reruns the whole page.
+    """
+    if any(job_status(name) in ("queued", "running") for name in names):
+        if message:
+            st.info(message)
+    else:
+        st.rerun()
+
+
+# Function to wait for pending jobs
+def wait_for_jobs(*names, message=None):
+    """
+    Stops the page run while any of the named jobs is still queued or running, leaving a fragment
+    that polls the jobs every POLL_INTERVAL seconds and reruns the page once they are done.
+    Only the fragment reruns while waiting, so the script thread is free and the rest of the
+    page is not recomputed.
+    Args:
+        names: The names of the jobs to wait for.
+        message: An optional progress message displayed while waiting.
+    """
+    if any(job_status(name) in ("queued", "running") for name in names):
+        _poll_jobs(names, message)
+        st.stop()
+
+
+# Function to cancel jobs of the current session
+def cancel_jobs(*names):
+    """
+    Cancels the named pending jobs of the current session, or all of them if no name is given.
+    """
+    job_ids = st.session_state.setdefault("jobs", {})
+    with _lock:
+        if not names:
+            _cancel_session(get_session_id())
+        for name in names:
+            job = _jobs.get(job_ids.get(name))
+            if job is not None:
+                _cancel(job)
+
+
+# Function to report the job system metrics
+def job_metrics():
+    """
+    Summarizes the state of the job system across all sessions.
+    Returns:
+        A dictionary with the interactive and background queue lengths, the number of running jobs, the job counters
+        and the average and p95 run times (in seconds) of the recent jobs.
+    """
+    with _lock:
+        statuses = [(job["status"], job["background"]) for job in _jobs.values()]
+        run_times = list(_run_times)
+        metrics = dict(_counters)
+
+    metrics["queue_length"] = statuses.count(("queued", False))
+    metrics["background_queue_length"] = statuses.count(("queued", True))
+    metrics["running"] = sum(status == "running" for status, _ in statuses)
+    metrics["avg_run_time"] = sum(run_times) / len(run_times) if run_times else None
+    metrics["p95_run_time"] = percentile(run_times, 95)
+    return metrics
@@ -0,0 +1,170 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Model tiers ordered from fastest to most capable. Each tier can point at a different
+# OpenAI-compatible endpoint through its base_url, so a local stand-in model (e.g. an
+# Ollama or vLLM server) can be plugged in for testing by setting the matching env vars.
+MODEL_TIERS = {
+    "fast": {
+        "model": os.getenv("TALENTSCOUT_FAST_MODEL", "gpt-4o-mini"),
+        "base_url": os.getenv("TALENTSCOUT_FAST_BASE_URL"),
+        "latency_slo": float(os.getenv("TALENTSCOUT_FAST_SLO", "4")),
+    },
+    "balanced": {
+        "model": os.getenv("TALENTSCOUT_BALANCED_MODEL", "gpt-4o-mini"),
+        "base_url": os.getenv("TALENTSCOUT_BALANCED_BASE_URL"),
+        "latency_slo": float(os.getenv("TALENTSCOUT_BALANCED_SLO", "8")),
+    },
+    "quality": {
+        "model": os.getenv("TALENTSCOUT_QUALITY_MODEL", "gpt-4o-mini"),
+        "base_url": os.getenv("TALENTSCOUT_QUALITY_BASE_URL"),
+        "latency_slo": float(os.getenv("TALENTSCOUT_QUALITY_SLO", "15")),
+    },
+}
+
+# Fallback order used when a tier breaches its latency SLO (slowest first)
+TIER_ORDER = ["quality", "balanced", "fast"]
+
+# Tier assigned to each call site
+ROUTE_TIERS = {
+    "analyse_resume_details": "balanced",
+    "create_overview": "fast",
+    "get_all_questions": "quality",
+    "get_response": "balanced",
+    "get_response_brief": "fast",
+    "conversation_analysis": "balanced",
+    "overall_analysis": "quality",
+    "call_gpt_vision": "quality",
+}
+
+DEFAULT_TIER = "balanced"
+
+# Only the latencies recorded within this window count towards the p95, so a tier that
+# was demoted gets retried once its slow samples have expired
+LATENCY_WINDOW_SECONDS = 300
+# Minimum number of samples in the window before a tier can be demoted
+MIN_SAMPLES = 5
+# Failed calls count towards the p95 only once there are this many in the window, so a single
+# transient error (e.g. one rate limited call) does not demote a route for the whole window.
+# Beyond that, with fewer than 20 samples in the window every failure lands in the p95.
+MIN_FAILURES = 2
+
+_latencies = {}
+_lock = threading.Lock()
+
+
+# Function to compute a percentile from a list of latencies
+def percentile(values, percent):
+    """
+    Computes the given percentile using the nearest-rank method.
+    Args:
+        values: A list of latencies in seconds.
+        percent: The percentile to compute (0-100).
+    Returns:
+        The percentile value, or None if there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+# Function to get the recent latencies of a route on a tier
+def _recent_latencies(route, tier_name, now):
+    """
+    Drops the samples older than the latency window and returns the remaining ones.
+    Must be called with the lock held.
+    """
+    samples = _latencies.get((route, tier_name))
+    if samples is None:
+        return []
+    while samples and now - samples[0][0] > LATENCY_WINDOW_SECONDS:
+        samples.popleft()
+    return [latency for _, latency in samples]
+
+
+# Function to select the tier a call site should use
+def select_tier(route):
+    """
+    Selects the model tier for the given call site. Starts from the configured tier and
+    falls back to a faster one while the p95 latency of the route exceeds the tier's SLO.
+    Args:
+        route: The name of the call site (see ROUTE_TIERS).
+    Returns:
+        A tuple of the tier name and its configuration (model, base_url, latency_slo).
+    """
+    tier_name = ROUTE_TIERS.get(route, DEFAULT_TIER)
+    now = time.monotonic()
+
+    with _lock:
+        for candidate in TIER_ORDER[TIER_ORDER.index(tier_name):]:
+            tier_name = candidate
+            recent = _recent_latencies(route, candidate, now)
+            if sum(latency == math.inf for latency in recent) < MIN_FAILURES:
+                recent = [latency for latency in recent if latency != math.inf]
+            if len(recent) < MIN_SAMPLES or percentile(recent, 95) <= MODEL_TIERS[candidate]["latency_slo"]:
+                break
+
+    return tier_name, MODEL_TIERS[tier_name]
+
+
+# Function to record the latency of a completed call
+def record_latency(route, tier_name, seconds):
+    """
+    Records the latency of a call made by a call site on a tier.
+    Args:
+        route: The name of the call site.
+        tier_name: The tier that served the call.
+        seconds: The wall-clock duration of the call.
+    """
+    with _lock:
+        _latencies.setdefault((route, tier_name), deque(maxlen=500)).append((time.monotonic(), seconds))
+
+
+# Function to time a call and record its latency, even when it fails
+@contextmanager
+def timed_call(route, tier_name):
+    """
+    Records the wall-clock duration of the wrapped call. A failed call (error or timeout) is
+    recorded as an infinite latency, so once MIN_FAILURES of them are in the window they count
+    as SLO breaches and a failing tier gets demoted.
+    Args:
+        route: The name of the call site.
+        tier_name: The tier serving the call.
+    """
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        record_latency(route, tier_name, math.inf if failed else time.perf_counter() - start)
+
+
+# Function to report the latency statistics per route
+def route_stats():
+    """
+    Summarizes the recent latencies recorded for each route and tier, to tune cost against speed.
+    Returns:
+        A dictionary keyed by (route, tier) with the sample count, the number of failed calls,
+        and the p50 and p95 latencies (infinite if failures dominate).
+    """
+    now = time.monotonic()
+    stats = {}
+    with _lock:
+        for route, tier_name in list(_latencies):
+            recent = _recent_latencies(route, tier_name, now)
+            stats[(route, tier_name)] = {
+                "model": MODEL_TIERS[tier_name]["model"],
+                "count": len(recent),
+                "failures": sum(latency == math.inf for latency in recent),
+                "p50": percentile(recent, 50),
+                "p95": percentile(recent, 95),
+            }
+    return stats
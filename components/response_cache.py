@@ -0,0 +1,214 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# Number of hash functions of the MinHash signatures
+NUM_PERMUTATIONS = 64
+# Minimum estimated Jaccard similarity for a near-identical answer of the same class to reuse a cached response
+SIMILARITY_THRESHOLD = float(os.getenv("TALENTSCOUT_CACHE_SIMILARITY", "0.8"))
+# Seconds a cached response stays valid
+CACHE_TTL_SECONDS = int(os.getenv("TALENTSCOUT_CACHE_TTL", "3600"))
+# Maximum number of cached responses before the least recently used ones are evicted
+CACHE_MAX_ENTRIES = int(os.getenv("TALENTSCOUT_CACHE_MAX_ENTRIES", "1000"))
+# Only short answers ("I don't know", "can you clarify?") are worth caching
+MAX_CACHEABLE_WORDS = 12
+
+# Answer types that must always go to the model: code, URLs and numbers, where a one
+# character difference changes the meaning of the answer
+ALWAYS_MODEL_PATTERNS = [
+    re.compile(r"```|[{};=<>()\[\]]"),
+    re.compile(r"https?://|www\."),
+    re.compile(r"\d"),
+]
+
+# Answer classes served by the similarity tier. Near-identical variants of these answers
+# ("i dont know", "sorry i do not know") get the same reaction; every other answer is only
+# served by the exact hash of the normalized answer
+SIMILAR_ANSWER_CLASSES = {
+    "dont_know": re.compile(r"\b(?:(?:i )?(?:dont|do not) know|no idea|(?:i am |im )?not sure)\b"),
+    "clarify": re.compile(r"\b(?:(?:can|could) you (?:please )?(?:clarify|explain|repeat|rephrase)|what do you mean)\b"),
+    "skip": re.compile(r"\b(?:(?:can we |can i |lets )?(?:skip|pass|move on))\b"),
+}
+# Filler words allowed around the class phrase ("sorry i dont know", "can you clarify this question please").
+# Any other word, e.g. the topic of "can you explain subclasses", keeps the answer in the exact hash tier
+FILLER_WORDS = {"sorry", "please", "um", "uh", "hmm", "well", "ok", "okay", "honestly", "actually", "again", "this", "that", "it", "the", "question"}
+# Maximum number of filler words around the class phrase
+MAX_EXTRA_WORDS = 3
+# Negation words: answers differing by one of them look near-identical character by character
+# but mean the opposite ("list is ordered" / "list is not ordered"), so an answer with one outside
+# its class phrase never goes through the similarity tier
+NEGATION_WORDS = {
+    "not", "no", "nor", "never", "none", "nothing", "neither", "nobody", "nowhere", "cannot",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "cant", "couldnt", "wont",
+    "wouldnt", "shouldnt", "hasnt", "havent", "hadnt", "mustnt", "neednt",
+}
+
+_entries = OrderedDict()
+_metrics = {"lookups": 0, "exact_hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0, "latency_saved": 0.0}
+_lock = threading.Lock()
+
+
+# Function to normalize an answer before hashing it
+def normalize_answer(answer: str) -> str:
+    """
+    Lowercases the answer, drops apostrophes, replaces the other punctuation with spaces
+    and collapses the whitespace.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", answer.lower().replace("'", "")).split())
+
+
+# Function to compute the MinHash signature of an answer
+def _minhash(text: str):
+    """
+    Computes the MinHash signature of the character 3-grams of the normalized answer.
+    """
+    padded = f" {text} "
+    shingles = {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+    return tuple(
+        min(zlib.crc32(f"{seed}:{shingle}".encode()) for shingle in shingles)
+        for seed in range(NUM_PERMUTATIONS)
+    )
+
+
+# Function to estimate the similarity of two answers
+def _similarity(signature_a, signature_b) -> float:
+    """
+    Estimates the Jaccard similarity of two answers from their MinHash signatures.
+    """
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / NUM_PERMUTATIONS
+
+
+# Function to check whether an answer must always go to the model
+def _must_call_model(answer: str) -> bool:
+    """
+    Checks the answer against the safety list of answer types that are never served from the cache.
+    """
+    if len(answer.split()) > MAX_CACHEABLE_WORDS:
+        return True
+    return any(pattern.search(answer) for pattern in ALWAYS_MODEL_PATTERNS)
+
+
+# Function to get the class of an answer allowed in the similarity tier
+def _answer_class(normalized: str):
+    """
+    Returns the allow-listed class of the normalized answer, or None if it may only be served
+    by exact hash. The answer must be the bare class phrase, with at most a few filler words
+    around it and no negation word.
+    """
+    for name, pattern in SIMILAR_ANSWER_CLASSES.items():
+        match = pattern.search(normalized)
+        if match is None:
+            continue
+        extra = f"{normalized[:match.start()]} {normalized[match.end():]}".split()
+        if len(extra) <= MAX_EXTRA_WORDS and all(word in FILLER_WORDS and word not in NEGATION_WORDS for word in extra):
+            return name
+    return None
+
+
+# Function to find a cached response for an answer
+def _lookup(question_hash: str, key: str, signature, answer_class, now: float):
+    """
+    Looks up the exact key first, then, for an allow-listed answer class, the most similar
+    answer of the same class to the same question.
+    Must be called with the lock held.
+    Returns:
+        A tuple of the cache entry and the hit type ("exact_hits" or "similar_hits"), or (None, None).
+    """
+    # Evict the expired entries
+    for entry_key, entry in list(_entries.items()):
+        if now - entry["created_at"] > CACHE_TTL_SECONDS:
+            del _entries[entry_key]
+
+    if key in _entries:
+        _entries.move_to_end(key)
+        return _entries[key], "exact_hits"
+
+    if answer_class is None:
+        return None, None
+
+    best_key, best_similarity = None, SIMILARITY_THRESHOLD
+    for entry_key, entry in _entries.items():
+        if entry["question_hash"] == question_hash and entry["answer_class"] == answer_class:
+            similarity = _similarity(signature, entry["signature"])
+            if similarity >= best_similarity:
+                best_key, best_similarity = entry_key, similarity
+
+    if best_key is None:
+        return None, None
+    _entries.move_to_end(best_key)
+    return _entries[best_key], "similar_hits"
+
+
+# Function to serve an interviewer reaction from the cache or the model
+def cached_response(question: str, answer: str, variant: str, call_model):
+    """
+    Returns the cached response for an identical answer to the same question, or a near-identical
+    one for the allow-listed answer classes, or calls the model and caches its response.
+    Args:
+        question: The question being answered.
+        answer: The user's answer.
+        variant: The prompt variant used for the answer, so different prompts never share responses.
+        call_model: A function making the LLM call when the cache misses.
+    Returns:
+        The response of the model.
+    """
+    if _must_call_model(answer):
+        with _lock:
+            _metrics["lookups"] += 1
+            _metrics["bypassed"] += 1
+        return call_model()
+
+    normalized = normalize_answer(answer)
+    question_hash = hashlib.sha256(f"{variant}\0{question}".encode()).hexdigest()
+    key = hashlib.sha256(f"{question_hash}\0{normalized}".encode()).hexdigest()
+    answer_class = _answer_class(normalized)
+    signature = _minhash(normalized)
+
+    with _lock:
+        _metrics["lookups"] += 1
+        entry, hit_type = _lookup(question_hash, key, signature, answer_class, time.monotonic())
+        if entry is not None:
+            _metrics[hit_type] += 1
+            _metrics["latency_saved"] += entry["latency"]
+            return entry["response"]
+        _metrics["misses"] += 1
+
+    start = time.perf_counter()
+    response = call_model()
+    latency = time.perf_counter() - start
+
+    with _lock:
+        _entries[key] = {
+            "response": response,
+            "question_hash": question_hash,
+            "answer_class": answer_class,
+            "signature": signature,
+            "latency": latency,
+            "created_at": time.monotonic(),
+        }
+        _entries.move_to_end(key)
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+    return response
+
+
+# Function to report the cache metrics
+def cache_metrics():
+    """
+    Summarizes the response cache usage.
+    Returns:
+        A dictionary with the lookup counters, the hit rate, the total model latency saved
+        (in seconds) and the number of cached responses.
+    """
+    with _lock:
+        metrics = dict(_metrics)
+        metrics["entries"] = len(_entries)
+
+    hits = metrics["exact_hits"] + metrics["similar_hits"]
+    metrics["hit_rate"] = hits / metrics["lookups"] if metrics["lookups"] else None
+    return metrics
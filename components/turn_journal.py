@@ -0,0 +1,94 @@
+import uuid
+import streamlit as st
+
+
+# Function to get the id of the current session
+def get_session_id() -> str:
+    """
+    Returns the id of the current session, creating it on first use.
+    """
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+# Function to initialize the journal state for the current session
+def _init_journal():
+    """
+    Creates the journal of completed LLM responses and the set of applied chat turns
+    in the session state if they are not set yet.
+    """
+    if "turn_journal" not in st.session_state:
+        st.session_state.turn_journal = {}
+    if "applied_turns" not in st.session_state:
+        st.session_state.applied_turns = set()
+
+
+# Function to build the idempotency key of a chat turn
+def turn_key(question_no: int, turn_index: int) -> str:
+    """
+    Builds the idempotency key identifying a chat turn.
+    Args:
+        question_no: The index of the current question.
+        turn_index: The position of the user's message in the chat history.
+    Returns:
+        A string key made of the session id, the question number and the turn index.
+    """
+    return f"{get_session_id()}:{question_no}:{turn_index}"
+
+
+# Function to get the journaled response of a call
+def journaled(key: str):
+    """
+    Returns the journaled response for the key, so a rerun replays it instead of calling the LLM again.
+    Args:
+        key: The idempotency key of the call.
+    Returns:
+        The journaled response, or None if the call has not completed yet.
+    """
+    _init_journal()
+    return st.session_state.turn_journal.get(key)
+
+
+# Function to journal the response of a completed call
+def record_response(key: str, response):
+    """
+    Journals the response of a completed LLM call under its idempotency key.
+    Args:
+        key: The idempotency key of the call.
+        response: The response of the call.
+    """
+    _init_journal()
+    st.session_state.turn_journal.setdefault(key, response)
+
+
+# Function to append a message to the chat history exactly once
+def append_turn(key: str, role: str, message: str):
+    """
+    Appends the message to the chat history unless it was already appended for this key and role.
+    Args:
+        key: The idempotency key of the chat turn.
+        role: The role of the message ("user" or "assistant").
+        message: The message content.
+    """
+    _init_journal()
+    if (key, role) not in st.session_state.applied_turns:
+        st.session_state.applied_turns.add((key, role))
+        st.session_state.chat_history.append((role, message))
+
+
+# Function to find a user turn still waiting for its response
+def pending_turn(question_no: int):
+    """
+    Checks whether the last message in the chat history is a user message without an
+    assistant response, e.g. because a rerun interrupted the LLM call.
+    Args:
+        question_no: The index of the current question.
+    Returns:
+        A tuple of the turn key and the user's message, or None if no turn is pending.
+    """
+    chat_history = st.session_state.chat_history
+    if chat_history and chat_history[-1][0] == "user":
+        turn_index = len(chat_history) - 1
+        return turn_key(question_no, turn_index), chat_history[-1][1]
+    return None
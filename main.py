@@ -3,6 +3,7 @@ from pages.ask_questions import ask_questions
 from pages.extract_details import extract_details
 from pages.report import report
 from components.call_gpt import check_gpt
+from components.job_queue import track_session
 import os
 
 # Fetch OpenAI API Key from environment variable
@@ -19,6 +20,9 @@ if "api_key" not in st.session_state:
 if "api_key_valid" not in st.session_state:
     st.session_state.api_key_valid = True
 
+# Refresh the heartbeat of the session on every run, so the jobs of an idle candidate are kept
+track_session()
+
 # If the API key is invalid, prompt the user to enter a valid API key
 if not st.session_state.api_key_valid:
     api_key = st.text_input("Enter your GPT API Key:", type="password")
@@ -1,18 +1,23 @@
 from typing import List
+import base64
 from pydantic import BaseModel
 import streamlit as st
 from components.call_gpt import call_gpt, call_gpt_vision
-from PIL import Image
+from components.blob_store import put_blob, get_blob, release_blob, release_owner_blobs
+from components.turn_journal import get_session_id, turn_key, journaled, record_response, append_turn, pending_turn
+from components.job_queue import submit_job, job_status, job_result, wait_for_jobs, show_job_error
+from components.response_cache import cached_response
+from components.conversation_analysis import conversation_analysis, format_conversation
 from streamlit_drawable_canvas import st_canvas
-from io import BytesIO
-import base64
+from components.canvas_payload import build_vision_payload
 
 
 # Function to render a drawing canvas for the user
 def draw_canvas():
     """
     Creates a canvas component where the user can draw using different tools. 
-    It returns the base64-encoded image of the drawing.
+    It returns the vision payload of the drawing: the PNG bytes of a thumbnail rasterized from the
+    simplified strokes and a short textual description of the shapes.
     """
     # Creating three columns for user input
     col1, col2, col3 = st.columns([1, 1, 1])
@@ -46,18 +51,9 @@ def draw_canvas():
         key="canvas",
     )
 
-    # If drawing exists, convert it to base64 string and return
-    if canvas_result.image_data is not None:
-        # Convert the image to bytes
-        buffered = BytesIO()
-        img = Image.fromarray(canvas_result.image_data.astype('uint8'), 'RGBA')
-        img.save(buffered, format="PNG")
-        img_bytes = buffered.getvalue()
-        
-        # Encode the image bytes into base64 format
-        img_base64 = base64.b64encode(img_bytes).decode()
-        
-        return img_base64
+    # If drawing exists, build a compact payload from its vector strokes and return it
+    if canvas_result.json_data is not None:
+        return build_vision_payload(canvas_result.json_data)
 
 
 # Function to generate a list of questions based on user's overview
@@ -85,7 +81,7 @@ def get_all_questions(overview_text: str):
         "content": "Using the given overview text, ask 3 questions to the user based on the user's tech_stack and experience. Try making those question in the sequence of easy, medium, and hard. Overview:"+overview_text
     }
 
-    all_questions.extend(call_gpt(system_message, user_message, outputStructure=Questions).questions)
+    all_questions.extend(call_gpt(system_message, user_message, outputStructure=Questions, route="get_all_questions").questions)
 
     # Debugging question related to user's tech stack
     system_message = {
@@ -98,7 +94,7 @@ def get_all_questions(overview_text: str):
         "content": "Based on the user's overview, create a debugging question with **one intentional bug** in the code. Make sure the bug is clearly identifiable. The output should contain only a single string: the question and the code snippet. The question should ask the user to identify and fix the bug. Make sure you add everything in a single string so that the question: List[str] has only one value. User's overview: " + overview_text
     }
 
-    all_questions.append(call_gpt(system_message, user_message, outputStructure=Questions).questions[0])
+    all_questions.append(call_gpt(system_message, user_message, outputStructure=Questions, route="get_all_questions").questions[0])
 
     # Architecture question related to drawing skills
     system_message = {
@@ -111,7 +107,7 @@ def get_all_questions(overview_text: str):
         "content": f"Ask the user to draw a short and simple architecture question based on the user's overview tech_stack and explain it briefly. Example: 'draw and explain Linked List'. \nUser's overview: {overview_text}"
     }
 
-    all_questions.append(call_gpt(system_message, user_message, outputStructure=Questions).questions[0])
+    all_questions.append(call_gpt(system_message, user_message, outputStructure=Questions, route="get_all_questions").questions[0])
 
     return all_questions
 
@@ -128,6 +124,7 @@ def get_response(question: str, user_answer: str, chat_length: int):
 
     # If it's the 4th question, proceed to the next question without hints
     if chat_length == 4:
+        route = "get_response_brief"  # A brief reaction is served by the fast tier
         system_message = {
             "role": "system",
             "content": "You are a technical interviewer. React to the user's answer briefly without hints or answers."
@@ -137,6 +134,7 @@ def get_response(question: str, user_answer: str, chat_length: int):
             "content": f"Question: {question}\nUser's answer: {user_answer}\nAlways set next_question to True with a brief reaction."
         }
     else:
+        route = "get_response"
         system_message = {
             "role": "system",
             "content": "You are a technical interviewer. React to the user's answer. Do not provide hints or answers. "
@@ -148,7 +146,24 @@ def get_response(question: str, user_answer: str, chat_length: int):
                        f"and set next_question to False. Otherwise, set next_question to True and prompt to move to the next question."
         }
 
-    return call_gpt(system_message, user_message, outputStructure=Response)
+    # Serve identical or near-identical short answers to the same question from the cache
+    return cached_response(question, user_answer, route, lambda: call_gpt(system_message, user_message, outputStructure=Response, route=route))
+
+
+# Function to answer a user's turn, run as a background job
+def answer_turn(question: str, user_answer: str, chat_length: int, canvas_payload: dict, is_architecture: bool):
+    """
+    Generates the interviewer's response to the user's answer. For the architecture question,
+    the drawn architecture is analysed first and the analysis is prepended to the answer.
+    """
+    image_analysis = ""
+    if is_architecture:
+        canvas_payload = canvas_payload or {}
+        image_base64 = base64.b64encode(get_blob(canvas_payload["image"])).decode() if canvas_payload.get("image") else None
+        image_analysis = "Analyze the user's drawn architecture based on the explanation provided."
+        image_analysis += call_gpt_vision(image_base64, question, canvas_payload.get("description"))
+
+    return get_response(question, image_analysis + user_answer, chat_length)
 
 
 # Main function to handle the interview process and manage the session
@@ -170,7 +185,7 @@ def ask_questions(overview_text: str):
         if 'chat_history' not in st.session_state:
             st.session_state.chat_history = []
             st.session_state.total_chat_history = []
-            st.session_state.imagebase64 = None
+            st.session_state.canvas_payload = None
 
         if "question_no" not in st.session_state:
             st.session_state.question_no = -1
@@ -195,8 +210,18 @@ def ask_questions(overview_text: str):
             col1, col2, col3 = st.columns([5, 5, 1])
             with col2:
                 if st.button("Start Interview"):
-                    with st.spinner("Generating Questions..."):
-                        st.session_state.questions = get_all_questions(overview_text)
+                    submit_job("questions", get_all_questions, overview_text)
+
+            # Start the interview once the questions are generated in the background
+            if job_status("questions") is not None:
+                wait_for_jobs("questions", message="Generating Questions...")
+                try:
+                    questions = job_result("questions")
+                except Exception as error:
+                    show_job_error("questions", error)
+                    questions = None
+                if questions is not None:
+                    st.session_state.questions = questions
                     st.session_state.update(question_no=0)
                     st.rerun()
 
@@ -214,6 +239,10 @@ def ask_questions(overview_text: str):
                         st.session_state.next_question = False
                         st.session_state.question_no += 1
                         st.session_state.total_chat_history.append(st.session_state.chat_history)
+
+                        # The conversation is final, so analyze it in the background for the report
+                        conversation_no = len(st.session_state.total_chat_history) - 1
+                        submit_job(f"summary:{conversation_no}", conversation_analysis, format_conversation(st.session_state.chat_history), background=True)
                         st.session_state.chat_history = []
                         st.rerun()
 
@@ -223,9 +252,18 @@ def ask_questions(overview_text: str):
                         with chatcol1:
                             messages = st.container(height=400)
                         with chatcol2:
-                            img = draw_canvas()
-                            if type(img) == str:
-                                st.session_state.imagebase64 = img
+                            canvas_payload = draw_canvas()
+                            if canvas_payload is not None:
+                                # Keep only a handle to the thumbnail in the session state
+                                previous_image = (st.session_state.canvas_payload or {}).get("image")
+                                if canvas_payload["image"] is not None:
+                                    canvas_payload["image"] = put_blob(canvas_payload["image"], get_session_id())
+                                st.session_state.canvas_payload = canvas_payload
+
+                                # Release the thumbnail replaced by the new stroke, unless the pending turn still reads it
+                                # (it is then released with the other blobs of the session when the chat is finished)
+                                if previous_image not in (None, canvas_payload["image"]) and pending_turn(st.session_state.question_no) is None:
+                                    release_blob(previous_image)
 
                     else:
                         messages = st.container(height=400)
@@ -234,22 +272,40 @@ def ask_questions(overview_text: str):
                     if len(st.session_state.chat_history) == 0:
                         st.session_state.chat_history.append(("assistant", st.session_state.questions[st.session_state.question_no]))
 
-                    # User input for answer
-                    if prompt := st.chat_input("Your answer...", max_chars=1000):
-                        st.session_state.chat_history.append(("user", prompt))
-                        with st.spinner("Generating Response..."):
-                            image_analysis = ""
-                            if st.session_state.question_no == len(st.session_state.questions) - 1:
-                                image_analysis = "Analyze the user's drawn architecture based on the explanation provided."
-                                image_analysis += call_gpt_vision(st.session_state.imagebase64, st.session_state.questions[st.session_state.question_no])
-
-                            response = get_response(st.session_state.questions[st.session_state.question_no], image_analysis + prompt, len(st.session_state.chat_history))
-
-                        st.session_state.chat_history.append(("assistant", f"Echo: {response.response}"))
-
-                        # Move to the next question
-                        if response.next_question:
-                            st.session_state.next_question = True
+                    # User input for answer, disabled until the pending turn is answered
+                    turn_pending = pending_turn(st.session_state.question_no) is not None
+                    if prompt := st.chat_input("Your answer...", max_chars=1000, disabled=turn_pending):
+                        # Ignore answers sent before the input was disabled, they would orphan the pending turn
+                        if not turn_pending:
+                            append_turn(turn_key(st.session_state.question_no, len(st.session_state.chat_history)), "user", prompt)
+                            st.rerun()  # Rerun to disable the input while the response is generated
+
+                    # Respond to the pending user turn in the background, replaying the journaled response if it already completed
+                    waiting_turn = failed_turn = None
+                    if turn := pending_turn(st.session_state.question_no):
+                        key, prompt = turn
+                        response = journaled(key)
+                        if response is None:
+                            is_architecture = st.session_state.question_no == len(st.session_state.questions) - 1
+                            submit_job(key, answer_turn, st.session_state.questions[st.session_state.question_no], prompt, len(st.session_state.chat_history), st.session_state.canvas_payload if is_architecture else None, is_architecture)
+                            try:
+                                response = job_result(key)
+                            except Exception as error:
+                                failed_turn = (key, error)
+                            if response is not None:
+                                record_response(key, response)
+
+                        if response is None:
+                            if failed_turn is None:
+                                waiting_turn = key
+                        else:
+                            append_turn(key, "assistant", f"Echo: {response.response}")
+
+                            # Move to the next question
+                            if response.next_question:
+                                st.session_state.next_question = True
+
+                            # Rerun to enable the chat input again
                             st.rerun()
 
                     # Display chat history
@@ -262,7 +318,18 @@ def ask_questions(overview_text: str):
                             st.session_state.next_question = True
                             st.rerun()
 
+                    # Let the candidate retry a turn that failed; the input stays disabled until it is answered
+                    if failed_turn is not None:
+                        show_job_error(*failed_turn)
+
+                    # Poll the background job until the response is ready
+                    if waiting_turn is not None:
+                        wait_for_jobs(waiting_turn, message="Generating Response...")
+                        st.rerun()
+
             elif st.session_state.question_no >= len(st.session_state.questions):
                 if st.button("Finish Chat"):
+                    # The canvas thumbnails are no longer needed once the interview is over
+                    release_owner_blobs(get_session_id())
                     st.session_state.page = "report"
                     st.rerun()
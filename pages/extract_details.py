@@ -2,7 +2,11 @@ import streamlit as st
 from openai import OpenAI
 import PyPDF2
 from pydantic import BaseModel
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from components.call_gpt import call_gpt
+from components.blob_store import put_blob, get_blob, release_blob
+from components.turn_journal import get_session_id
+from components.job_queue import submit_job, job_status, job_result, wait_for_jobs, cancel_jobs, show_job_error
 from pages.ask_questions import ask_questions
 
 
@@ -22,6 +26,32 @@ def extract_text_from_pdf(pdf_file):
     return text
 
 
+# Function to free an uploaded file held by Streamlit
+def release_upload(file_id):
+    """
+    Removes an uploaded file from Streamlit's uploaded file manager, which otherwise keeps its
+    bytes in memory until the session ends. Only call it once the file uploader is no longer
+    displayed, as the uploader loses the file.
+    Args:
+        file_id: The file_id of the uploaded file.
+    """
+    ctx = get_script_run_ctx()
+    # Only the in-memory manager (Streamlit's default) supports removing a single file
+    if ctx is not None and hasattr(ctx.uploaded_file_mgr, "remove_file"):
+        ctx.uploaded_file_mgr.remove_file(ctx.session_id, file_id)
+
+
+# Function to release the extracted resume text
+def release_resume():
+    """
+    Releases the resume text from the blob store and forgets it in the session state.
+    """
+    if st.session_state.get("resume_handle") is not None:
+        release_blob(st.session_state.resume_handle)
+    st.session_state.resume_handle = None
+    st.session_state.resume_file_id = None
+
+
 # Function to analyze resume details using OpenAI API
 def analyse_resume_details(resume_text):
     """
@@ -52,7 +82,7 @@ def analyse_resume_details(resume_text):
         "content": resume_text
     }
 
-    resume_info = call_gpt(system_message, user_message, outputStructure=ResumeAnalysis)
+    resume_info = call_gpt(system_message, user_message, outputStructure=ResumeAnalysis, route="analyse_resume_details")
 
     resume_dict = {
         "full_name": resume_info.full_name,
@@ -89,7 +119,7 @@ def create_overview(resume_dict):
         "content": str(resume_dict)
     }
 
-    return call_gpt(system_message, user_message, outputStructure=Overview)
+    return call_gpt(system_message, user_message, outputStructure=Overview, route="create_overview")
 
 
 # Function to handle the extraction of details from resume or manual form submission
@@ -116,19 +146,39 @@ def extract_details():
         # Upload resume PDF
         uploaded_file = st.file_uploader("Upload Resume (PDF)", type=["pdf"])
 
+        # Cancel the analysis of a resume that was replaced or removed
+        resume_job = f"resume:{uploaded_file.file_id}" if uploaded_file is not None else None
+        if st.session_state.get("resume_job") not in (None, resume_job):
+            cancel_jobs(st.session_state.resume_job)
+            release_resume()
+        st.session_state.resume_job = resume_job
+
         if uploaded_file is not None:
             # Display loading spinner while analyzing resume
             with st.spinner("Analyzing... This may take a moment."):
-                resume_text = extract_text_from_pdf(uploaded_file)
+                # Extract the text once per uploaded file, not on every rerun. The session state only keeps
+                # its length and, if it is analysed, a handle to it in the blob store
+                if st.session_state.get("resume_file_id") != uploaded_file.file_id:
+                    resume_text = extract_text_from_pdf(uploaded_file)
+                    st.session_state.resume_file_id = uploaded_file.file_id
+                    st.session_state.resume_length = len(resume_text)
+                    st.session_state.resume_handle = put_blob(resume_text.encode(), get_session_id()) if 100 <= len(resume_text) <= 10000 else None
 
                 # Handle case when resume text is too short or too long
-                if len(resume_text) < 100:
+                if st.session_state.resume_length < 100:
                     st.error("The uploaded file does not contain enough text to be a valid resume. Please upload a different file.")
-                elif len(resume_text) > 10000:
+                elif st.session_state.resume_length > 10000:
                     st.error("The uploaded file contains too much text to be processed. Please upload a shorter resume.")
                 else:
-                    # Proceed with analyzing the extracted resume details
-                    resume_dict = analyse_resume_details(resume_text)
+                    # Proceed with analyzing the extracted resume details in the background
+                    if job_status(resume_job) is None:
+                        submit_job(resume_job, analyse_resume_details, get_blob(st.session_state.resume_handle).decode())
+                    wait_for_jobs(resume_job, message="Analyzing... This may take a moment.")
+                    try:
+                        resume_dict = job_result(resume_job)
+                    except Exception as error:
+                        show_job_error(resume_job, error)
+                        st.stop()
 
                     # Show success message after successful analysis
                     st.success("Analysis complete!")
@@ -195,22 +245,35 @@ def extract_details():
         # Submit button logic
         if st.button("Submit", key="submit_button"):
             if all([full_name.strip(), email_address.strip(), phone_number.strip(), years_of_experience.strip(), desired_position.strip(), current_location.strip(), tech_stack.strip(), other_details.strip()]):
-                with st.spinner("Creating Short Overview of your details..."):
-                    resume_dict = {
-                        "full_name": full_name,
-                        "email_address": email_address,
-                        "phone_number": phone_number,
-                        "years_of_experience": years_of_experience,
-                        "desired_position": desired_position,
-                        "current_location": current_location,
-                        "tech_stack": tech_stack,
-                        "other_details": other_details
-                    }
-                    overview_text = create_overview(resume_dict)
-                
-                # After submission, store overview in session and rerun to navigate to the next page
+                resume_dict = {
+                    "full_name": full_name,
+                    "email_address": email_address,
+                    "phone_number": phone_number,
+                    "years_of_experience": years_of_experience,
+                    "desired_position": desired_position,
+                    "current_location": current_location,
+                    "tech_stack": tech_stack,
+                    "other_details": other_details
+                }
+                submit_job("overview", create_overview, resume_dict)
+            else:
+                st.error("Please fill out all fields before submitting.")
+
+        # Wait for the overview to be created in the background
+        if job_status("overview") is not None:
+            wait_for_jobs("overview", message="Creating Short Overview of your details...")
+            try:
+                overview_text = job_result("overview")
+            except Exception as error:
+                show_job_error("overview", error)  # Retrying clears the error so the details can be submitted again
+                overview_text = None
+
+            # After submission, store overview in session and rerun to navigate to the next page
+            if overview_text is not None:
+                # The resume is no longer needed: free its text and Streamlit's copy of the upload
+                if st.session_state.get("resume_file_id") is not None:
+                    release_upload(st.session_state.resume_file_id)
+                release_resume()
                 st.session_state.page = "ask_questions"  # Redirect to next step
                 st.session_state.overview_text = overview_text.overview  # Store the overview text in session state
                 st.rerun()  # Rerun to switch pages
-            else:
-                st.error("Please fill out all fields before submitting.")
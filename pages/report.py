@@ -1,38 +1,10 @@
+import time
 from typing import List
 from pydantic import BaseModel
 import streamlit as st
 from components.call_gpt import call_gpt
-
-
-# Function to analyze a single conversation and provide a brief summary
-def conversation_analysis(conversation: str) -> str:
-    """
-    Analyzes the user's conversation to provide a very small brief summary based on communication
-    and technical skills. The summary is objective and concise.
-
-    Args:
-        conversation (str): The conversation to analyze.
-
-    Returns:
-        str: A brief summary based on communication and technical skills.
-    """
-    class Summary(BaseModel):
-        summary: str
-
-    # System message instructing the AI to analyze the conversation
-    system_message = {
-        "role": "system",
-        "content": "Analyze the user's conversation and provide a very small brief summary on the basis of communication and technical skills objectively."
-    }
-
-    # User message containing the conversation to analyze
-    user_message = {
-        "role": "user",
-        "content": "Analyze the following conversation. Provide a very small summary on the basis of communication and technical skills based on the content.\n\n" + conversation
-    }
-
-    # Call the GPT model to generate the summary
-    return call_gpt(system_message, user_message, outputStructure=Summary).summary
+from components.conversation_analysis import conversation_analysis, format_conversation
+from components.job_queue import submit_job, wait_for_jobs, job_result, job_timings, show_job_error
 
 
 # Function to provide an overall analysis based on multiple conversation summaries
@@ -66,7 +38,27 @@ def overall_analysis(conversations_analysis: List[str]):
     }
 
     # Call the GPT model to generate the overall analysis
-    return call_gpt(system_message, user_message, outputStructure=Summary)
+    return call_gpt(system_message, user_message, outputStructure=Summary, route="overall_analysis")
+
+
+# Function to measure how much analysis latency was hidden by precomputing the summaries
+def hidden_latency(summary_jobs: List[str], report_opened_at: float) -> dict:
+    """
+    Measures how much of the wait for the conversation analysis was hidden by running it during
+    the interview. The summaries run in parallel, so without precomputing them the report would
+    have waited for the longest one (the critical path), not for the sum of their run times.
+
+    Args:
+        summary_jobs (List[str]): The names of the conversation analysis jobs.
+        report_opened_at (float): When the report was opened (time.monotonic()).
+
+    Returns:
+        dict: The seconds of waiting saved ("hidden") out of the critical path ("total").
+    """
+    timings = [job_timings(job) for job in summary_jobs]
+    critical_path = max((t["finished_at"] - t["started_at"] for t in timings), default=0.0)
+    waited = max((t["finished_at"] - report_opened_at for t in timings), default=0.0)
+    return {"hidden": max(0.0, critical_path - max(0.0, waited)), "total": critical_path}
 
 
 # Function to generate and display the interview summary report
@@ -89,46 +81,74 @@ def report(total_chat_history: List[List[tuple]]):
 
     if st.session_state.page == "report":
         st.title("Interview Summary Report")
-        all_summaries = []
-
-        # Display spinner while analyzing conversations
-        with st.spinner("Analyzing Conversations..."):
-            for i, conversation in enumerate(total_chat_history):
-                # Combine all messages in the conversation into a single text string
-                conversation_text = ""
-                for role, msg in conversation:
-                    conversation_text += f"{role}: {msg}\n"
-                # Analyze each conversation and store the summary
-                all_summaries.append(f"Conversation {i+1}: {conversation_analysis(conversation_text)}")
-
-            # Perform the overall analysis based on the individual conversation summaries
-            overall_summary = overall_analysis(all_summaries)
+
+        # Record when the report was opened, to measure the latency hidden by the precomputed summaries
+        if "report_opened_at" not in st.session_state:
+            st.session_state.report_opened_at = time.monotonic()
+
+        # Summaries are precomputed as each conversation closes; submitting again reuses those jobs
+        summary_jobs = [f"summary:{i}" for i in range(len(total_chat_history))]
+        for job, conversation in zip(summary_jobs, total_chat_history):
+            submit_job(job, conversation_analysis, format_conversation(conversation))
+        summaries = []
+        for job in summary_jobs:
+            try:
+                summaries.append(job_result(job))
+            except Exception as error:
+                show_job_error(job, error)
+                summaries.append(None)
+        pending_jobs = [job for job, summary in zip(summary_jobs, summaries) if summary is None]
+
+        # Perform the overall analysis once all the conversation summaries are available
+        overall_summary = None
+        if not pending_jobs:
+            all_summaries = [f"Conversation {i+1}: {summary}" for i, summary in enumerate(summaries)]
+            submit_job("overall", overall_analysis, all_summaries)
+            try:
+                overall_summary = job_result("overall")
+            except Exception as error:
+                show_job_error("overall", error)
+            if overall_summary is None:
+                pending_jobs.append("overall")
+
+            if "report_latency" not in st.session_state:
+                st.session_state.report_latency = hidden_latency(summary_jobs, st.session_state.report_opened_at)
+
+        if overall_summary is None:
+            analyzed = sum(summary is not None for summary in summaries)
+            st.info(f"Analyzing Conversations... ({analyzed}/{len(summaries)} analyzed)")
+        else:
             overall_summary_text = overall_summary.summary
             communication_skills = overall_summary.communication_skills
             technical_skills = overall_summary.technical_skills
             key_takeaways = overall_summary.key_takeaways
 
-        # Display key takeaways and skill ratings
-        st.subheader("Key Takeaways:")
-        for takeaway in key_takeaways:
-            st.write(f"- {takeaway}")
+            # Display key takeaways and skill ratings
+            st.subheader("Key Takeaways:")
+            for takeaway in key_takeaways:
+                st.write(f"- {takeaway}")
 
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write(f"Communication Skills: {communication_skills}/10")
-        with col2:
-            st.write(f"Technical Skills: {technical_skills}/10")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"Communication Skills: {communication_skills}/10")
+            with col2:
+                st.write(f"Technical Skills: {technical_skills}/10")
 
-        # Display the overall summary
-        st.subheader("Overall Summary")
-        st.write(overall_summary_text)
+            # Display the overall summary
+            st.subheader("Overall Summary")
+            st.write(overall_summary_text)
 
-        # Display detailed conversation analysis with expandable sections
+        # Display detailed conversation analysis with expandable sections, as soon as each summary is available
         st.subheader("Detailed Conversation Analysis:")
         for i, conversation in enumerate(total_chat_history):
-            conversation_text = ""
-            for role, msg in conversation:
-                conversation_text += f"{role}: {msg}\n"
-            with st.expander(f"Conversation {i+1} Summary: {all_summaries[i]}"):
+            summary = summaries[i] if summaries[i] is not None else "Analyzing..."
+            with st.expander(f"Conversation {i+1} Summary: Conversation {i+1}: {summary}"):
                 st.write("Conversation:")
-                st.text(conversation_text)
+                st.text(format_conversation(conversation))
+
+        if "report_latency" in st.session_state:
+            latency = st.session_state.report_latency
+            st.caption(f"{latency['hidden']:.1f}s of the {latency['total']:.1f}s wait for the conversation analysis was hidden during the interview.")
+
+        # Poll the background jobs until the whole report is available
+        wait_for_jobs(*pending_jobs)